@@ -12,6 +12,8 @@ import sys
 import pandas as pd
 from textblob import TextBlob
 
+from heavy_hitters import SpaceSaving
+
 
 def detect_columns(df):
     text_cols = [c for c in df.columns if c.lower() in ("content", "text", "transcript")]
@@ -85,7 +87,25 @@ def extract_noun_phrases(text):
     return [np.strip().lower() for np in blob.noun_phrases if np.strip()]
 
 
-def analyze(df, text_col, date_col, out_dir, top_n=100, ner_backend="spacy", spacy_nlp=None):
+def new_counter(capacity=None, sketch_path=None):
+    """Exact Counter, or a Space-Saving sketch (resumed from `sketch_path` if it exists)."""
+    if not capacity:
+        return Counter()
+    if sketch_path and os.path.exists(sketch_path):
+        return SpaceSaving.load(sketch_path)
+    return SpaceSaving(capacity)
+
+
+def top_frame(counter, top_n, label):
+    df = pd.DataFrame(counter.most_common(top_n), columns=[label, "count"])
+    if isinstance(counter, SpaceSaving):
+        # true count lies in [count - error, count]
+        df["error"] = [counter.error(item) for item in df[label]]
+    return df
+
+
+def analyze(df, text_col, date_col, out_dir, top_n=100, ner_backend="spacy", spacy_nlp=None,
+            capacity=None, sketch_dir=None):
     if date_col is None:
         df["__year"] = "unknown"
     else:
@@ -93,10 +113,15 @@ def analyze(df, text_col, date_col, out_dir, top_n=100, ner_backend="spacy", spa
         df["__year"] = df["__date_parsed"].dt.year.fillna("unknown").astype(str)
 
     os.makedirs(out_dir, exist_ok=True)
+    if sketch_dir:
+        os.makedirs(sketch_dir, exist_ok=True)
+
+    def sketch_path(year, kind):
+        return os.path.join(sketch_dir, f"{year}_{kind}.json") if sketch_dir else None
 
     for year, group in df.groupby("__year"):
-        np_counter = Counter()
-        ent_counter = Counter()
+        np_counter = new_counter(capacity, sketch_path(year, "noun_phrases"))
+        ent_counter = new_counter(capacity, sketch_path(year, "entities"))
         for text in group[text_col].astype(str):
             nps = extract_noun_phrases(text)
             np_counter.update(nps)
@@ -106,11 +131,15 @@ def analyze(df, text_col, date_col, out_dir, top_n=100, ner_backend="spacy", spa
                 ents = extract_entities_textblob(text)
             ent_counter.update(ents)
 
-        np_df = pd.DataFrame(np_counter.most_common(top_n), columns=["noun_phrase", "count"])
+        if sketch_dir:
+            np_counter.save(sketch_path(year, "noun_phrases"))
+            ent_counter.save(sketch_path(year, "entities"))
+
+        np_df = top_frame(np_counter, top_n, "noun_phrase")
         np_out = os.path.join(out_dir, f"{year}_noun_phrases.csv")
         np_df.to_csv(np_out, index=False)
 
-        ent_df = pd.DataFrame(ent_counter.most_common(top_n), columns=["entity", "count"])
+        ent_df = top_frame(ent_counter, top_n, "entity")
         ent_out = os.path.join(out_dir, f"{year}_entities.csv")
         ent_df.to_csv(ent_out, index=False)
 
@@ -135,8 +164,17 @@ def main():
     p.add_argument("--top", type=int, default=200, help="how many top items to keep per year")
     p.add_argument("--ner", choices=("spacy", "textblob"), default="spacy", help="NER backend to use")
     p.add_argument("--spacy-model", default="en_core_web_sm", help="spaCy model name to load when --ner spacy")
+    p.add_argument("--approx", action="store_true", help="approximate top-N with bounded memory (Space-Saving)")
+    p.add_argument("--capacity", type=int, help="items tracked per year in --approx mode (default: 10 x --top)")
+    p.add_argument("--sketch-dir", help="save/resume per-year sketches here to add new batches incrementally (implies --approx)")
     args = p.parse_args()
 
+    capacity = None
+    if args.approx or args.sketch_dir:
+        capacity = args.capacity or 10 * args.top
+        if capacity < args.top:
+            raise SystemExit("--capacity must be at least --top.")
+
     df = pd.read_csv(args.input)
     text_col = args.text_col
     date_col = args.date_col
@@ -160,7 +198,8 @@ def main():
             print(f"spaCy model '{args.spacy_model}' could not be loaded. Install with: python -m spacy download {args.spacy_model}")
             sys.exit(1)
 
-    analyze(df, text_col, date_col, out_dir, top_n=args.top, ner_backend=args.ner, spacy_nlp=spacy_nlp)
+    analyze(df, text_col, date_col, out_dir, top_n=args.top, ner_backend=args.ner, spacy_nlp=spacy_nlp,
+            capacity=capacity, sketch_dir=args.sketch_dir)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Bounded-memory approximate top-N counting (Space-Saving).
+
+A SpaceSaving summary tracks at most `capacity` items. Each tracked item has a
+count that never underestimates its true frequency and an error such that the
+true frequency is at least `count - error`. Any untracked item occurred at most
+`min_count()` times, which is itself at most n / capacity.
+
+Summaries are mergeable (Agarwal et al., "Mergeable Summaries"), so workers can
+count disjoint shards and incremental batches can be folded into a saved
+summary without revisiting earlier text.
+"""
+import heapq
+import json
+from collections import Counter
+
+
+class SpaceSaving:
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.n = 0
+        self.counts = {}
+        self.errors = {}
+        self._heap = []
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __contains__(self, item):
+        return item in self.counts
+
+    # ----------------------------
+    # Updates
+    # ----------------------------
+    def add(self, item, count: int = 1) -> None:
+        self.n += count
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+        else:
+            floor, victim = self._pop_min()
+            del self.counts[victim]
+            del self.errors[victim]
+            self.counts[item] = floor + count
+            self.errors[item] = floor
+        heapq.heappush(self._heap, (self.counts[item], item))
+        if len(self._heap) > 4 * self.capacity:
+            self._rebuild_heap()
+
+    def update(self, items) -> None:
+        """Count an iterable of items (pre-aggregated, like Counter.update)."""
+        for item, count in Counter(items).items():
+            self.add(item, count)
+
+    def _pop_min(self):
+        # Heap entries go stale when an item's count changes; skip those
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                return count, item
+
+    def _rebuild_heap(self):
+        self._heap = [(c, item) for item, c in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def min_count(self) -> int:
+        """Upper bound on the frequency of any item not being tracked."""
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(self.counts.values())
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """Fold `other` into this summary (in place) and return self."""
+        if other.capacity != self.capacity:
+            # The error bounds assume both summaries drop items at the same floor
+            raise ValueError(f"cannot merge sketches of capacity {other.capacity} and {self.capacity}")
+        floor_self = self.min_count()
+        floor_other = other.min_count()
+        counts = {}
+        errors = {}
+        for item in set(self.counts) | set(other.counts):
+            counts[item] = self.counts.get(item, floor_self) + other.counts.get(item, floor_other)
+            errors[item] = self.errors.get(item, floor_self) + other.errors.get(item, floor_other)
+
+        keep = heapq.nlargest(self.capacity, counts, key=counts.get)
+        self.counts = {item: counts[item] for item in keep}
+        self.errors = {item: errors[item] for item in keep}
+        self.n += other.n
+        self._rebuild_heap()
+        return self
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+    def most_common(self, n: int | None = None) -> list[tuple]:
+        """(item, count) pairs, highest count first, like Counter.most_common."""
+        items = sorted(self.counts.items(), key=lambda kv: (-kv[1], kv[0]))
+        return items if n is None else items[:n]
+
+    def error(self, item) -> int:
+        return self.errors.get(item, self.min_count())
+
+    # ----------------------------
+    # Persistence
+    # ----------------------------
+    def to_dict(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "n": self.n,
+            "items": [[item, c, self.errors[item]] for item, c in self.most_common()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SpaceSaving":
+        s = cls(data["capacity"])
+        s.n = data["n"]
+        for item, c, e in data["items"]:
+            s.counts[item] = c
+            s.errors[item] = e
+        s._rebuild_heap()
+        return s
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> "SpaceSaving":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
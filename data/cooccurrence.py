@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Keyword co-occurrence counts and association scores per year and country.
+
+Speeches are turned into the nonzero coordinates of a binary speech x keyword
+matrix X. For each year/country group g, the co-occurrence matrix X_g.T @ X_g is
+computed sparsely: a self-join of the group's hits on speech id, counted per
+keyword pair. Only pairs that actually share a speech are ever materialised, so
+cost follows the number of hits rather than the square of the vocabulary.
+
+PMI and Jaccard are then vectorized over the pairs that co-occur in at least
+`min_count` speeches, using the per-keyword speech counts (the diagonal).
+
+Usage:
+  python cooccurrence.py --hits speech_keyword_hits.csv --store corpus_store
+"""
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+from corpus_store import CorpusStore
+
+OUT_COOCCURRENCE = "keyword_cooccurrence.json"
+
+
+# ----------------------------
+# Sparse matrices
+# ----------------------------
+def speech_keyword_coords(hits: pd.DataFrame, speech_ids, keyword_ids) -> tuple[np.ndarray, np.ndarray]:
+    """(row, col) of the nonzeros of X, rows in `speech_ids` order, columns in `keyword_ids` order."""
+    r = pd.Index(speech_ids).get_indexer(hits["id"])
+    c = pd.Index(keyword_ids).get_indexer(hits["keyword_id"])
+    keep = (r >= 0) & (c >= 0)
+    n_keywords = len(keyword_ids)
+    flat = np.unique(r[keep].astype(np.int64) * n_keywords + c[keep])
+    return flat // n_keywords, flat % n_keywords
+
+
+def cooccurrence_pairs(rows: np.ndarray, cols: np.ndarray, n_keywords: int, min_count: int = 2):
+    """Upper triangle of X.T @ X with count >= min_count, as (a, b, count) arrays."""
+    hits = pd.DataFrame({"row": rows, "col": cols})
+    joined = hits.merge(hits, on="row")
+    a = joined["col_x"].to_numpy(np.int64)
+    b = joined["col_y"].to_numpy(np.int64)
+    upper = a < b
+    flat, counts = np.unique(a[upper] * n_keywords + b[upper], return_counts=True)
+    keep = counts >= min_count
+    return flat[keep] // n_keywords, flat[keep] % n_keywords, counts[keep]
+
+
+def association_scores(a: np.ndarray, b: np.ndarray, count: np.ndarray, n: np.ndarray,
+                       n_speeches: int) -> tuple[np.ndarray, np.ndarray]:
+    """PMI and Jaccard for pairs (a, b) given per-keyword speech counts `n`."""
+    n_a = n[a].astype(float)
+    n_b = n[b].astype(float)
+    pmi = np.log(count * n_speeches / (n_a * n_b))
+    jaccard = count / (n_a + n_b - count)
+    return pmi, jaccard
+
+
+def group_cooccurrence(rows: np.ndarray, cols: np.ndarray, n_keywords: int, groups: pd.DataFrame,
+                       min_count: int = 2):
+    """Yield (year, country, n_speeches, pairs) for each group.
+
+    `groups` is indexed by speech row and has year and country columns. `pairs`
+    is a (k, 5) array of [a, b, count, pmi, jaccard] for keyword columns a < b.
+    """
+    codes = np.empty(len(groups), dtype=np.int64)
+    keys = []
+    for g, (key, pos) in enumerate(groups.groupby(["year", "country"], dropna=False).indices.items()):
+        codes[pos] = g
+        keys.append((key, len(pos)))
+
+    # Sort hits by group so each group's nonzeros are one contiguous slice
+    hit_groups = codes[rows]
+    order = np.argsort(hit_groups, kind="stable")
+    bounds = np.searchsorted(hit_groups[order], np.arange(len(keys) + 1))
+
+    for g, ((year, country), n_speeches) in enumerate(keys):
+        sl = order[bounds[g]:bounds[g + 1]]
+        g_rows, g_cols = rows[sl], cols[sl]
+        n = np.bincount(g_cols, minlength=n_keywords)
+        a, b, count = cooccurrence_pairs(g_rows, g_cols, n_keywords, min_count)
+        pmi, jaccard = association_scores(a, b, count, n, n_speeches)
+        yield year, country, n_speeches, np.column_stack([a, b, count, pmi, jaccard])
+
+
+# ----------------------------
+# Artifact
+# ----------------------------
+def build_artifact(hits: pd.DataFrame, speeches: pd.DataFrame, keyword_ids: list[str], min_count: int = 2) -> dict:
+    """Compact JSON-ready payload; keyword pairs refer to positions in `keywords`."""
+    speeches = speeches.dropna(subset=["year"]).reset_index(drop=True)
+    rows, cols = speech_keyword_coords(hits, speeches["id"], keyword_ids)
+
+    out_groups = []
+    groups = speeches[["year", "country"]]
+    for year, country, n_speeches, pairs in group_cooccurrence(rows, cols, len(keyword_ids), groups, min_count):
+        out_groups.append({
+            "year": int(year),
+            "country": country,
+            "n_speeches": n_speeches,
+            "pairs": [
+                [int(i), int(j), int(cnt), round(float(p), 4), round(float(jac), 4)]
+                for i, j, cnt, p, jac in pairs
+            ],
+        })
+
+    return {
+        "keywords": [str(k) for k in keyword_ids],
+        "fields": ["a", "b", "count", "pmi", "jaccard"],
+        "min_count": min_count,
+        "groups": out_groups,
+    }
+
+
+def write_artifact(artifact: dict, path: str = OUT_COOCCURRENCE) -> None:
+    with open(path, "w") as f:
+        json.dump(artifact, f, separators=(",", ":"))
+
+
+# ----------------------------
+# CLI
+# ----------------------------
+def main():
+    p = argparse.ArgumentParser(description="Keyword co-occurrence per year and country")
+    p.add_argument("--hits", default="speech_keyword_hits.csv", help="speech/keyword hits (id, keyword)")
+    p.add_argument("--keywords", default="keywords.csv", help="keyword id mapping")
+    p.add_argument("--store", default="corpus_store", help="corpus store for speech year/country")
+    p.add_argument("--min-count", type=int, default=2, help="minimum speeches a pair must share")
+    p.add_argument("-o", "--out", default=OUT_COOCCURRENCE)
+    args = p.parse_args()
+
+    kdf = pd.read_csv(args.keywords, dtype=str)
+    kw_name_to_id = dict(zip(kdf["keyword"].str.strip(), kdf["id"].str.strip()))
+
+    hits = pd.read_csv(args.hits)
+    hits["keyword_id"] = hits["keyword"].map(kw_name_to_id)
+    hits = hits.dropna(subset=["keyword_id"])
+
+    with CorpusStore(args.store) as store:
+        speeches = store.to_frame()
+
+    artifact = build_artifact(hits, speeches, kdf["id"].str.strip().tolist(), args.min_count)
+    write_artifact(artifact, args.out)
+    print(f"Wrote {args.out} ({len(artifact['groups'])} year/country groups)")
+
+
+if __name__ == "__main__":
+    main()
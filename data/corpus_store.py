@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Memory-mapped corpus store for speech text.
+
+All speech bodies are written once into a single contiguous UTF-8 file with an
+offset/length index and id/year/country metadata arrays. Opening the store maps
+the files read-only, so any number of worker processes can slice texts by
+speech id while sharing one page-cache copy.
+
+Layout of a store directory:
+  texts.bin      concatenated UTF-8 speech bodies
+  ids.npy        speech ids (int64)
+  offsets.npy    byte offset of each text in texts.bin (int64)
+  lengths.npy    byte length of each text (int64)
+  years.npy      year of each speech, -1 when unknown (int16)
+  countries.npy  index into meta.json "countries" (int16)
+  meta.json      country names and row count
+
+Usage:
+  python corpus_store.py CH_RU.csv -o corpus_store
+"""
+import argparse
+import json
+import mmap
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+TEXTS_FILE = "texts.bin"
+META_FILE = "meta.json"
+ARRAY_FILES = ("ids", "offsets", "lengths", "years", "countries")
+
+
+# ----------------------------
+# Build
+# ----------------------------
+def build_store(df: pd.DataFrame, out_dir: str, text_col: str = "content") -> str:
+    """Write `df` (id, year, country, text_col) to a store directory.
+
+    The store is written into a temporary sibling directory and then swapped in,
+    so processes that still map the previous store keep reading intact files.
+    """
+    out_dir = os.path.normpath(out_dir)
+    tmp_dir = f"{out_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    ids = df["id"].to_numpy(dtype=np.int64)
+    years = pd.to_numeric(df["year"], errors="coerce").fillna(-1).to_numpy(dtype=np.int16)
+    country_codes, countries = pd.factorize(df["country"].fillna("unknown").astype(str), sort=True)
+
+    offsets = np.empty(len(df), dtype=np.int64)
+    lengths = np.empty(len(df), dtype=np.int64)
+    pos = 0
+    with open(os.path.join(tmp_dir, TEXTS_FILE), "wb") as f:
+        for i, text in enumerate(df[text_col].fillna("").astype(str)):
+            data = text.encode("utf-8")
+            f.write(data)
+            offsets[i] = pos
+            lengths[i] = len(data)
+            pos += len(data)
+
+    arrays = {
+        "ids": ids,
+        "offsets": offsets,
+        "lengths": lengths,
+        "years": years,
+        "countries": country_codes.astype(np.int16),
+    }
+    for name, arr in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), arr)
+
+    with open(os.path.join(tmp_dir, META_FILE), "w") as f:
+        json.dump({"countries": list(countries), "n_speeches": len(df), "n_bytes": pos}, f, indent=2)
+
+    _swap_in(tmp_dir, out_dir)
+    return out_dir
+
+
+def _swap_in(tmp_dir: str, out_dir: str) -> None:
+    # Rename rather than overwrite: open mappings hold the old files' inodes,
+    # which stay valid until the last reader closes them
+    old_dir = f"{out_dir}.old-{os.getpid()}"
+    if os.path.exists(out_dir):
+        os.replace(out_dir, old_dir)
+    os.replace(tmp_dir, out_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+# ----------------------------
+# Read
+# ----------------------------
+class CorpusStore:
+    """Read-only, memory-mapped view over a store directory.
+
+    Instances pickle as just their path, so handing one to a multiprocessing
+    worker re-opens the mapping there instead of copying any text.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        self.countries = meta["countries"]
+
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in ARRAY_FILES}
+        self.ids = arrays["ids"]
+        self.offsets = arrays["offsets"]
+        self.lengths = arrays["lengths"]
+        self.years = arrays["years"]
+        self.country_codes = arrays["countries"]
+
+        self._file = open(os.path.join(path, TEXTS_FILE), "rb")
+        # mmap refuses zero-length files; an empty corpus just has no buffer
+        if meta["n_bytes"]:
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._buf = b""
+        self._row = {int(sid): i for i, sid in enumerate(self.ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, speech_id) -> bool:
+        return int(speech_id) in self._row
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def close(self) -> None:
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def row(self, speech_id) -> int:
+        return self._row[int(speech_id)]
+
+    def raw(self, speech_id) -> memoryview:
+        """Zero-copy UTF-8 bytes of one speech."""
+        i = self.row(speech_id)
+        start = int(self.offsets[i])
+        return memoryview(self._buf)[start:start + int(self.lengths[i])]
+
+    def text(self, speech_id) -> str:
+        return str(self.raw(speech_id), "utf-8")
+
+    def year(self, speech_id) -> int | None:
+        y = int(self.years[self.row(speech_id)])
+        return None if y < 0 else y
+
+    def country(self, speech_id) -> str:
+        return self.countries[int(self.country_codes[self.row(speech_id)])]
+
+    def select(self, years=None, countries=None) -> np.ndarray:
+        """Speech ids matching the given years and/or country names."""
+        mask = np.ones(len(self), dtype=bool)
+        if years is not None:
+            mask &= np.isin(self.years, list(years))
+        if countries is not None:
+            codes = [self.countries.index(c) for c in countries if c in self.countries]
+            mask &= np.isin(self.country_codes, codes)
+        return np.asarray(self.ids)[mask]
+
+    def iter_texts(self, speech_ids=None):
+        """Yield (speech_id, text) pairs, in store order by default."""
+        ids = self.ids if speech_ids is None else speech_ids
+        for sid in ids:
+            yield int(sid), self.text(sid)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Metadata only (no text): id, year, country."""
+        return pd.DataFrame({
+            "id": np.asarray(self.ids),
+            "year": np.where(np.asarray(self.years) < 0, np.nan, np.asarray(self.years)),
+            "country": np.asarray(self.countries, dtype=object)[np.asarray(self.country_codes)],
+        })
+
+
+# ----------------------------
+# CLI
+# ----------------------------
+def main():
+    p = argparse.ArgumentParser(description="Build a memory-mapped corpus store from a speeches CSV")
+    p.add_argument("input", help="speeches CSV (id, country, date, content)")
+    p.add_argument("-o", "--out", default="corpus_store", help="output store directory")
+    p.add_argument("--encoding", default="latin1", help="CSV encoding")
+    args = p.parse_args()
+
+    df = pd.read_csv(args.input, encoding=args.encoding)
+    df["year"] = pd.to_datetime(df["date"], errors="coerce").dt.year
+    build_store(df, args.out)
+    print(f"Wrote {len(df)} speeches to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
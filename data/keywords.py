@@ -1,12 +1,23 @@
 import re
 import pandas as pd
 
+from cooccurrence import OUT_COOCCURRENCE, build_artifact, write_artifact
+from corpus_store import CorpusStore, build_store
+from kwic import KwicIndex, build_index, save_index, write_shards
+from term_stats import OUT_TERM_STATS, TermStats
+from viz_series import COVERAGE_PATH, OUT_VIZ_CACHE, OUT_VIZ_COUNTS, build_cache, load_coverage, write_cache
+
 SPEECHES_PATH = "CH_RU.csv"
 KEYWORDS_PATH = "keywords.csv"
 
 OUT_SPEECHES_WIDE = "speeches_processed.csv"
 OUT_HITS_LONG = "speech_keyword_hits.csv"
 OUT_COUNTS = "keyword_year_counts.csv"
+OUT_CORPUS_STORE = "corpus_store"
+OUT_KWIC_INDEX = "kwic_index.npz"
+OUT_KWIC_SHARDS = "kwic"
+OUT_DISTINCTIVE_BY_YEAR = "distinctive_terms_by_year.csv"
+OUT_DISTINCTIVE_BY_COUNTRY = "distinctive_terms_by_country.csv"
 
 # ----------------------------
 # Helpers
@@ -46,6 +57,9 @@ df["year"] = df["date"].dt.year
 df["content"] = df["content"].astype(str).fillna("")
 df["_scan_text"] = df["content"]
 
+# Shared memory-mapped copy of the texts for later (multi-process) stages
+build_store(df, OUT_CORPUS_STORE)
+
 keywords = load_keywords(KEYWORDS_PATH)
 patterns = {k: make_pattern(k) for k in keywords}
 
@@ -53,13 +67,17 @@ patterns = {k: make_pattern(k) for k in keywords}
 # Keyword detection
 # ----------------------------
 hits = []
+matches = []
 
 for k in keywords:
     col = slugify(k)
-    df[col] = df["_scan_text"].apply(lambda t: bool(patterns[k].search(t)))
+    spans = df["_scan_text"].apply(lambda t: [m.span() for m in patterns[k].finditer(t)])
+    df[col] = spans.str.len() > 0
 
-    for speech_id in df.loc[df[col], "id"]:
+    for speech_id, speech_spans in zip(df.loc[df[col], "id"], spans[df[col]]):
         hits.append({"id": speech_id, "keyword": k})
+        for start, end in speech_spans:
+            matches.append({"id": speech_id, "keyword": k, "start": start, "end": end})
 
 df["keywords_found"] = df.apply(
     lambda r: ";".join([k for k in keywords if r[slugify(k)]]),
@@ -140,12 +158,47 @@ print(f"keywords size: {len(keyword_ids)}")
 print(f"counts size: {len(counts_list)}")
 print(f"totals size: {len(totals_list)}")
 
-cache = {
-    "id_country": id_country_dict,
+# Raw aggregates, kept out of the page payload
+raw_counts = {
     "keywords": keyword_ids,
+    "id_country": id_country_dict,
     "counts": counts_list,
     "total_speeches": totals_list
 }
 
-with open("viz_cache.json", "w") as f:
-    json.dump(cache, f, indent=2)
\ No newline at end of file
+with open(OUT_VIZ_COUNTS, "w") as f:
+    json.dump(raw_counts, f, indent=2)
+
+# Plot-ready counts, rates and confidence intervals; coverage filters live in coverage.json
+cache = build_cache(keyword_ids, agg[["year", "keyword", "country", "count"]], total_speeches, load_coverage(COVERAGE_PATH))
+print(f"series size: {sum(len(v) for v in cache['series'].values())}")
+write_cache(cache, OUT_VIZ_CACHE)
+
+# ---
+# Keyword-in-context snippet index (offsets -> sentence windows)
+# ---
+matches_df = pd.DataFrame(matches, columns=["id", "keyword", "start", "end"])
+matches_df["keyword_id"] = matches_df["keyword"].map(kw_name_to_id)
+matches_df = matches_df.dropna(subset=["keyword_id"])
+
+store = CorpusStore(OUT_CORPUS_STORE)
+save_index(build_index(matches_df, store), OUT_KWIC_INDEX)
+shards = write_shards(KwicIndex(OUT_KWIC_INDEX, store), OUT_KWIC_SHARDS)
+print(f"kwic matches: {len(matches_df)}, shards: {len(shards)}")
+
+# ---
+# Keyword x keyword co-occurrence per year/country
+# ---
+cooc = build_artifact(hits_df, df[["id", "year", "country"]], list(keyword_ids))
+write_artifact(cooc, OUT_COOCCURRENCE)
+print(f"cooccurrence groups: {len(cooc['groups'])}")
+
+# ---
+# Distinctive terms (cached document-term matrix; only new or changed speeches are tokenized)
+# ---
+term_stats = TermStats.load(OUT_TERM_STATS)
+changed = term_stats.add_documents(store)
+term_stats.save(OUT_TERM_STATS)
+term_stats.distinctive("year").to_csv(OUT_DISTINCTIVE_BY_YEAR, index=False)
+term_stats.distinctive("country").to_csv(OUT_DISTINCTIVE_BY_COUNTRY, index=False)
+print(f"term stats: {len(term_stats)} speeches ({changed} updated), {term_stats.n_terms} terms")
\ No newline at end of file
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""Keyword-in-context (KWIC) snippet index.
+
+`keywords.py` records the character offset of every keyword match. This module
+turns those matches into a compact index (speech id, keyword id, year, country,
+match span, sentence window) sorted by keyword/year/country, so a query for one
+keyword in one year and country is a binary search plus a slice. Snippet text
+is cut from the memory-mapped corpus store on demand rather than duplicated.
+
+Usage:
+  python kwic.py 43 --year 2022 --country China --page 0
+"""
+import argparse
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from corpus_store import CorpusStore
+
+SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+|\n+")
+
+# Sort order of the index; queries rely on it
+INDEX_COLUMNS = ("keyword_id", "year", "country", "speech_id", "start", "end", "win_start", "win_end")
+INDEX_DTYPES = {
+    "keyword_id": np.int32,
+    "year": np.int16,
+    "country": np.int16,
+    "speech_id": np.int64,
+    "start": np.int32,
+    "end": np.int32,
+    "win_start": np.int32,
+    "win_end": np.int32,
+}
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+def sentence_window(text: str, start: int, end: int, radius: int = 300) -> tuple[int, int]:
+    """Bounds of the sentence(s) around text[start:end], capped at `radius` chars each side."""
+    lo = max(0, start - radius)
+    win_start = lo
+    for m in SENTENCE_END.finditer(text, lo, start):
+        win_start = m.end()
+
+    hi = min(len(text), end + radius)
+    m = SENTENCE_END.search(text, end, hi)
+    win_end = m.start() + 1 if m and text[m.start()] in ".!?" else (m.start() if m else hi)
+    return win_start, win_end
+
+
+# ----------------------------
+# Build
+# ----------------------------
+def build_index(matches: pd.DataFrame, store: CorpusStore, radius: int = 300) -> pd.DataFrame:
+    """Index rows from matches (id, keyword_id, start, end) against the store texts."""
+    if matches.empty:
+        return pd.DataFrame({c: pd.Series(dtype=t) for c, t in INDEX_DTYPES.items()})[list(INDEX_COLUMNS)]
+
+    rows = [store.row(sid) for sid in matches["id"]]
+    idx = pd.DataFrame({
+        "keyword_id": matches["keyword_id"].astype(int).to_numpy(),
+        "year": np.asarray(store.years)[rows],
+        "country": np.asarray(store.country_codes)[rows],
+        "speech_id": matches["id"].astype(np.int64).to_numpy(),
+        "start": matches["start"].to_numpy(),
+        "end": matches["end"].to_numpy(),
+    })
+
+    win_start = np.empty(len(idx), dtype=np.int32)
+    win_end = np.empty(len(idx), dtype=np.int32)
+    # Group by speech so each text is decoded from the store once
+    for sid, pos in idx.groupby("speech_id").indices.items():
+        text = store.text(sid)
+        for i in pos:
+            win_start[i], win_end[i] = sentence_window(text, idx.at[i, "start"], idx.at[i, "end"], radius)
+    idx["win_start"] = win_start
+    idx["win_end"] = win_end
+
+    idx = idx.astype(INDEX_DTYPES)
+    return idx.sort_values(list(INDEX_COLUMNS[:5]), kind="stable").reset_index(drop=True)
+
+
+def save_index(idx: pd.DataFrame, path: str) -> None:
+    np.savez_compressed(path, **{c: idx[c].to_numpy() for c in INDEX_COLUMNS})
+
+
+# ----------------------------
+# Query
+# ----------------------------
+class KwicIndex:
+    """Paginated snippet lookup over a saved index and its corpus store."""
+
+    def __init__(self, path: str, store: CorpusStore):
+        with np.load(path) as data:
+            self.cols = {c: data[c] for c in INDEX_COLUMNS}
+        self.store = store
+
+    def __len__(self) -> int:
+        return len(self.cols["speech_id"])
+
+    def _rows(self, keyword_id, year=None, country=None) -> np.ndarray:
+        kw = self.cols["keyword_id"]
+        lo, hi = np.searchsorted(kw, [int(keyword_id), int(keyword_id) + 1])
+        mask = np.ones(hi - lo, dtype=bool)
+        if year is not None:
+            mask &= self.cols["year"][lo:hi] == int(year)
+        if country is not None:
+            if country not in self.store.countries:
+                return np.empty(0, dtype=np.int64)
+            mask &= self.cols["country"][lo:hi] == self.store.countries.index(country)
+        return np.arange(lo, hi)[mask]
+
+    def count(self, keyword_id, year=None, country=None) -> int:
+        return len(self._rows(keyword_id, year, country))
+
+    def snippet(self, i: int) -> dict:
+        c = {k: int(v[i]) for k, v in self.cols.items()}
+        text = self.store.text(c["speech_id"])
+        window = text[c["win_start"]:c["win_end"]]
+        return {
+            "id": c["speech_id"],
+            "keyword_id": c["keyword_id"],
+            "year": c["year"] if c["year"] >= 0 else None,
+            "country": self.store.countries[c["country"]],
+            "offset": c["start"],
+            "snippet": window,
+            "match": [c["start"] - c["win_start"], c["end"] - c["win_start"]],
+        }
+
+    def query(self, keyword_id, year=None, country=None, page: int = 0, page_size: int = 20) -> dict:
+        rows = self._rows(keyword_id, year, country)
+        page_rows = rows[page * page_size:(page + 1) * page_size]
+        return {
+            "keyword_id": str(keyword_id),
+            "year": year,
+            "country": country,
+            "total": len(rows),
+            "page": page,
+            "page_size": page_size,
+            "snippets": [self.snippet(i) for i in page_rows],
+        }
+
+
+# ----------------------------
+# Web shards
+# ----------------------------
+def write_shards(index: KwicIndex, out_dir: str, max_per_group: int = 50) -> list[str]:
+    """Write one JSON file per keyword, grouped as country -> year -> {speeches, matches, snippets}.
+
+    `speeches` counts distinct speeches (the number the chart plots) and
+    `matches` counts every occurrence. Snippets are [speech id, sentence
+    window, [match start, match end]], one per speech for the first
+    `max_per_group` speeches, so the page can show a sample next to the chart
+    and fall back to the query API for more.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    cols = index.cols
+    written = []
+    for kid in np.unique(cols["keyword_id"]):
+        lo, hi = np.searchsorted(cols["keyword_id"], [kid, kid + 1])
+        year = cols["year"][lo:hi]
+        country = cols["country"][lo:hi]
+        speech = cols["speech_id"][lo:hi]
+
+        # Rows are sorted by (year, country, speech id), so boundaries are value changes
+        new_group = np.ones(hi - lo, dtype=bool)
+        new_group[1:] = (year[1:] != year[:-1]) | (country[1:] != country[:-1])
+        new_speech = new_group.copy()
+        new_speech[1:] |= speech[1:] != speech[:-1]
+        group_starts = np.flatnonzero(new_group)
+        group_ends = np.append(group_starts[1:], hi - lo)
+
+        groups = {}
+        for g_lo, g_hi in zip(group_starts, group_ends):
+            first_rows = g_lo + np.flatnonzero(new_speech[g_lo:g_hi])
+            snippets = []
+            for i in first_rows[:max_per_group]:
+                s = index.snippet(lo + i)
+                snippets.append([s["id"], s["snippet"], s["match"]])
+            y = int(year[g_lo])
+            groups.setdefault(index.store.countries[int(country[g_lo])], {})[str(y if y >= 0 else None)] = {
+                "speeches": len(first_rows),
+                "matches": int(g_hi - g_lo),
+                "snippets": snippets,
+            }
+
+        path = os.path.join(out_dir, f"{int(kid)}.json")
+        with open(path, "w") as f:
+            json.dump({"keyword_id": str(int(kid)), "groups": groups}, f, ensure_ascii=False)
+        written.append(path)
+    return written
+
+
+# ----------------------------
+# CLI
+# ----------------------------
+def main():
+    p = argparse.ArgumentParser(description="Query keyword-in-context snippets")
+    p.add_argument("keyword_id", help="keyword id from keywords.csv")
+    p.add_argument("--year", type=int)
+    p.add_argument("--country")
+    p.add_argument("--page", type=int, default=0)
+    p.add_argument("--page-size", type=int, default=20)
+    p.add_argument("--index", default="kwic_index.npz")
+    p.add_argument("--store", default="corpus_store")
+    args = p.parse_args()
+
+    index = KwicIndex(args.index, CorpusStore(args.store))
+    result = index.query(args.keyword_id, args.year, args.country, args.page, args.page_size)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
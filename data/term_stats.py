@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""Distinctive-term statistics over the speech corpus.
+
+The corpus is tokenized once into a sparse document-term matrix kept as COO
+arrays (doc row, term id, count). Per-year / per-country tables are then
+bincount aggregations of that matrix, and the scores are whole-matrix numpy
+operations:
+
+  tfidf     group term frequency x speech-level inverse document frequency
+  log_odds  weighted log-odds ratio with an informative Dirichlet prior
+            (Monroe, Colaresi & Quinn 2008), as z-scores of each group
+            against the rest of the corpus, or of one group against another
+
+The matrix is cached on disk with a fingerprint (byte length and CRC-32 of the
+text, plus year and country) per speech. On the next run only new or changed
+speeches are tokenized and speeches no longer in the store are dropped, so
+regenerating tables or the word cloud is a query.
+
+Usage:
+  python term_stats.py --by country --method log_odds --top 30
+  python term_stats.py --compare 2022 2021 --by year
+  python term_stats.py --by country --group China --wordcloud ../wordcloud.png
+"""
+import argparse
+import json
+import os
+import re
+import zlib
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from corpus_store import CorpusStore
+
+OUT_TERM_STATS = "term_stats"
+TOKEN_RE = re.compile(r"[a-z][a-z'\-]*[a-z]")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have having
+he her here hers herself him himself his how i if in into is it its itself just let me more most my myself
+no nor not now of off on once only or other our ours ourselves out over own same she should so some such
+than that the their theirs them themselves then there these they this those through to too under until up
+upon very was we were what when where which while who whom why will with would you your yours yourself
+yourselves mr ms mrs said says also us one two three many much may might must shall well within without
+""".split())
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+def tokenize(text: str) -> list[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if len(t) > 2 and t not in STOPWORDS]
+
+
+def _year_key(y) -> int:
+    return -1 if pd.isna(y) else int(y)
+
+
+def fingerprint(raw: memoryview) -> int:
+    """Byte length and CRC-32 of a speech's UTF-8 text packed into one int64."""
+    return (len(raw) << 32) | zlib.crc32(raw)
+
+
+# ----------------------------
+# Document-term matrix
+# ----------------------------
+class TermStats:
+    """Cached sparse document-term matrix with grouped scoring queries."""
+
+    def __init__(self):
+        self.vocab = []
+        self.term_id = {}
+        self.doc_ids = np.empty(0, dtype=np.int64)
+        self.years = np.empty(0, dtype=np.int16)
+        self.countries = np.empty(0, dtype=str)
+        self.fingerprints = np.empty(0, dtype=np.int64)
+        self.rows = np.empty(0, dtype=np.int32)
+        self.cols = np.empty(0, dtype=np.int32)
+        self.vals = np.empty(0, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    @property
+    def n_terms(self) -> int:
+        return len(self.vocab)
+
+    # -- build / update --------------------------------------------------
+    def add_documents(self, store: CorpusStore, speech_ids=None) -> int:
+        """Bring the matrix in line with the store; returns how many speeches changed.
+
+        Speeches that are new, or whose text, year or country differ from the
+        cached fingerprint, are (re-)tokenized. When `speech_ids` is omitted the
+        whole store is synced and cached speeches missing from it are dropped.
+        """
+        ids = [int(s) for s in (store.ids if speech_ids is None else speech_ids)]
+        cached = {int(sid): r for r, sid in enumerate(self.doc_ids)}
+
+        stale = np.zeros(len(self), dtype=bool)
+        if speech_ids is None:
+            in_store = set(ids)
+            stale |= np.fromiter((int(sid) not in in_store for sid in self.doc_ids), dtype=bool, count=len(self))
+        removed = int(stale.sum())
+
+        todo = []
+        for sid in ids:
+            r = cached.get(sid)
+            if r is not None and (
+                self.fingerprints[r] == fingerprint(store.raw(sid))
+                and self.years[r] == _year_key(store.year(sid))
+                and self.countries[r] == store.country(sid)
+            ):
+                continue
+            if r is not None:
+                stale[r] = True
+            todo.append(sid)
+
+        if stale.any():
+            self._drop_docs(stale)
+        if todo:
+            self._append_docs(store, todo)
+        return removed + len(todo)
+
+    def _drop_docs(self, stale: np.ndarray) -> None:
+        keep_entry = ~stale[self.rows]
+        new_row = np.cumsum(~stale) - 1
+        self.rows = new_row[self.rows[keep_entry]].astype(np.int32)
+        self.cols = self.cols[keep_entry]
+        self.vals = self.vals[keep_entry]
+        for name in ("doc_ids", "years", "countries", "fingerprints"):
+            setattr(self, name, getattr(self, name)[~stale])
+
+    def _append_docs(self, store: CorpusStore, new_ids: list[int]) -> None:
+        rows, cols, vals = [], [], []
+        base = len(self.doc_ids)
+        for r, sid in enumerate(new_ids, start=base):
+            for term, n in Counter(tokenize(store.text(sid))).items():
+                tid = self.term_id.get(term)
+                if tid is None:
+                    tid = self.term_id[term] = len(self.vocab)
+                    self.vocab.append(term)
+                rows.append(r)
+                cols.append(tid)
+                vals.append(n)
+
+        self.doc_ids = np.concatenate([self.doc_ids, np.asarray(new_ids, dtype=np.int64)])
+        self.years = np.concatenate([self.years, np.asarray([_year_key(store.year(s)) for s in new_ids], dtype=np.int16)])
+        self.countries = np.concatenate([self.countries, np.asarray([store.country(s) for s in new_ids], dtype=str)])
+        self.fingerprints = np.concatenate([
+            self.fingerprints, np.asarray([fingerprint(store.raw(s)) for s in new_ids], dtype=np.int64),
+        ])
+        self.rows = np.concatenate([self.rows, np.asarray(rows, dtype=np.int32)])
+        self.cols = np.concatenate([self.cols, np.asarray(cols, dtype=np.int32)])
+        self.vals = np.concatenate([self.vals, np.asarray(vals, dtype=np.int32)])
+
+    # -- persistence -----------------------------------------------------
+    def save(self, path: str = OUT_TERM_STATS) -> None:
+        os.makedirs(path, exist_ok=True)
+        np.savez_compressed(
+            os.path.join(path, "dtm.npz"),
+            doc_ids=self.doc_ids, years=self.years, countries=self.countries, fingerprints=self.fingerprints,
+            rows=self.rows, cols=self.cols, vals=self.vals,
+        )
+        with open(os.path.join(path, "vocab.json"), "w", encoding="utf-8") as f:
+            json.dump(self.vocab, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str = OUT_TERM_STATS) -> "TermStats":
+        ts = cls()
+        if not os.path.exists(os.path.join(path, "dtm.npz")):
+            return ts
+        with np.load(os.path.join(path, "dtm.npz")) as data:
+            for name in ("doc_ids", "years", "countries", "rows", "cols", "vals"):
+                setattr(ts, name, data[name])
+            # Caches written before fingerprints existed are re-tokenized on the next sync
+            ts.fingerprints = data["fingerprints"] if "fingerprints" in data else np.full(len(ts.doc_ids), -1, dtype=np.int64)
+        with open(os.path.join(path, "vocab.json"), encoding="utf-8") as f:
+            ts.vocab = json.load(f)
+        ts.term_id = {t: i for i, t in enumerate(ts.vocab)}
+        return ts
+
+    # -- aggregation -----------------------------------------------------
+    def group_keys(self, by: str) -> np.ndarray:
+        if by == "year":
+            return self.years
+        if by == "country":
+            return self.countries
+        if by == "year_country":
+            return np.char.add(np.char.add(self.years.astype(str), "|"), self.countries)
+        raise ValueError(f"unknown grouping: {by!r}")
+
+    def group_counts(self, by: str) -> tuple[np.ndarray, np.ndarray]:
+        """(labels, G x V term-count matrix) for the grouping `by`."""
+        labels, codes = np.unique(self.group_keys(by), return_inverse=True)
+        G, V = len(labels), self.n_terms
+        flat = np.bincount(codes[self.rows].astype(np.int64) * V + self.cols, weights=self.vals, minlength=G * V)
+        return labels, flat.reshape(G, V)
+
+    def idf(self) -> np.ndarray:
+        """Smoothed speech-level inverse document frequency per term."""
+        doc_freq = np.bincount(self.cols, minlength=self.n_terms)
+        return np.log((1 + len(self)) / (1 + doc_freq)) + 1
+
+    # -- scores ----------------------------------------------------------
+    def tfidf(self, by: str) -> tuple[np.ndarray, np.ndarray]:
+        labels, counts = self.group_counts(by)
+        tf = counts / np.maximum(counts.sum(axis=1, keepdims=True), 1)
+        return labels, tf * self.idf()
+
+    def log_odds(self, by: str, alpha0: float = 1000.0) -> tuple[np.ndarray, np.ndarray]:
+        """z-scores of each group against all other groups, using the corpus as prior."""
+        labels, counts = self.group_counts(by)
+        total = counts.sum(axis=0)
+        alpha = alpha0 * total / max(total.sum(), 1)
+        rest = total - counts
+        return labels, _log_odds_z(counts, rest, alpha, alpha0)
+
+    def compare(self, by: str, a, b, alpha0: float = 1000.0) -> np.ndarray:
+        """z-scores of group `a` against group `b` (positive = more typical of `a`)."""
+        labels, counts = self.group_counts(by)
+        ia, ib = _group_row(labels, a, by), _group_row(labels, b, by)
+        total = counts.sum(axis=0)
+        alpha = alpha0 * total / max(total.sum(), 1)
+        return _log_odds_z(counts[ia][None, :], counts[ib][None, :], alpha, alpha0)[0]
+
+    # -- tables ----------------------------------------------------------
+    def distinctive(self, by: str, method: str = "log_odds", top: int = 30, min_count: int = 5) -> pd.DataFrame:
+        """Long table of the top-scoring terms per group: group, rank, term, score, count."""
+        labels, scores = self.tfidf(by) if method == "tfidf" else self.log_odds(by)
+        _, counts = self.group_counts(by)
+        scores = np.where(counts >= min_count, scores, -np.inf)
+
+        k = min(top, self.n_terms)
+        if k == 0:
+            return pd.DataFrame(columns=["group", "rank", "term", "score", "count"])
+        top_idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top_idx, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top_idx = np.take_along_axis(top_idx, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        G = len(labels)
+        out = pd.DataFrame({
+            "group": np.repeat(labels, k),
+            "rank": np.tile(np.arange(1, k + 1), G),
+            "term": np.asarray(self.vocab, dtype=object)[top_idx.ravel()],
+            "score": top_scores.ravel(),
+            "count": np.take_along_axis(counts, top_idx, axis=1).ravel().astype(int),
+        })
+        return out[np.isfinite(out["score"])].reset_index(drop=True)
+
+    def word_weights(self, by: str | None = None, group=None, top: int = 200) -> dict[str, float]:
+        """Term -> weight for a word cloud: TF-IDF of one group, or of the whole corpus."""
+        if by is None:
+            counts = np.bincount(self.cols, weights=self.vals, minlength=self.n_terms)
+            s = counts / max(counts.sum(), 1) * self.idf()
+        else:
+            labels, scores = self.tfidf(by)
+            s = scores[_group_row(labels, group, by)]
+        idx = np.argsort(-s)[:top]
+        return {self.vocab[i]: float(s[i]) for i in idx if s[i] > 0}
+
+
+def _group_row(labels: np.ndarray, group, by: str) -> int:
+    names = labels.astype(str).tolist()
+    if str(group) not in names:
+        raise ValueError(f"unknown {by} group {group!r}; valid groups: {', '.join(names)}")
+    return names.index(str(group))
+
+
+def _log_odds_z(y_i: np.ndarray, y_j: np.ndarray, alpha: np.ndarray, alpha0: float) -> np.ndarray:
+    n_i = y_i.sum(axis=1, keepdims=True)
+    n_j = y_j.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta = (np.log((y_i + alpha) / (n_i + alpha0 - y_i - alpha))
+                 - np.log((y_j + alpha) / (n_j + alpha0 - y_j - alpha)))
+        var = 1.0 / (y_i + alpha) + 1.0 / (y_j + alpha)
+        z = delta / np.sqrt(var)
+    return np.where(np.isfinite(z), z, 0.0)
+
+
+def draw_wordcloud(weights: dict[str, float], out_path: str) -> bool:
+    """Render `weights` with the optional `wordcloud` package; False if it is missing."""
+    try:
+        from wordcloud import WordCloud
+    except ImportError:
+        return False
+    WordCloud(width=1600, height=800, background_color="white").generate_from_frequencies(weights).to_file(out_path)
+    return True
+
+
+# ----------------------------
+# CLI
+# ----------------------------
+def main():
+    p = argparse.ArgumentParser(description="Distinctive terms per year/country from the cached document-term matrix")
+    p.add_argument("--store", default="corpus_store", help="corpus store (the cache is synced to it first)")
+    p.add_argument("--cache", default=OUT_TERM_STATS, help="term statistics cache directory")
+    p.add_argument("--by", choices=("year", "country", "year_country"), default="country")
+    p.add_argument("--method", choices=("log_odds", "tfidf"), default="log_odds")
+    p.add_argument("--top", type=int, default=30)
+    p.add_argument("--compare", nargs=2, metavar=("A", "B"), help="log-odds of group A against group B")
+    p.add_argument("--group", help="group to draw with --wordcloud (default: whole corpus)")
+    p.add_argument("--wordcloud", help="write a word cloud PNG (needs the wordcloud package)")
+    p.add_argument("-o", "--out", help="write the table to this CSV instead of printing it")
+    args = p.parse_args()
+
+    ts = TermStats.load(args.cache)
+    with CorpusStore(args.store) as store:
+        changed = ts.add_documents(store)
+    if changed:
+        ts.save(args.cache)
+    print(f"{len(ts)} speeches, {ts.n_terms} terms ({changed} speeches updated)")
+
+    if args.wordcloud:
+        try:
+            weights = ts.word_weights(args.by if args.group else None, args.group)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        if not draw_wordcloud(weights, args.wordcloud):
+            raise SystemExit("The wordcloud package is not installed. Install with: pip install wordcloud")
+        print(f"Wrote {args.wordcloud}")
+        return
+
+    if args.compare:
+        try:
+            z = ts.compare(args.by, *args.compare)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        idx = np.argsort(-z)
+        top = np.concatenate([idx[:args.top], idx[::-1][:args.top]])
+        table = pd.DataFrame({"term": np.asarray(ts.vocab, dtype=object)[top], "z": z[top]})
+    else:
+        table = ts.distinctive(args.by, args.method, args.top)
+
+    if args.out:
+        table.to_csv(args.out, index=False)
+        print(f"Wrote {args.out}")
+    else:
+        print(table.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
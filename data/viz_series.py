@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Ready-to-plot keyword series for the insights page.
+
+Builds, in one vectorized pass over the full keyword x country x year grid,
+the raw speech counts, the percentage of speeches mentioning each keyword and a
+Wilson confidence interval for that percentage. Which years/countries are shown
+is declared in coverage.json rather than hard-coded in the page:
+
+  exclude_years     years dropped everywhere (e.g. a partial current year)
+  country_min_year  first year with usable coverage per country
+  omit_zero_points  countries whose zero-count years are left out of the series
+  confidence        confidence level of the interval
+
+viz_cache.json holds only what the page reads: keywords, coverage, the covered
+years and, under "series":
+  {keyword_id: {country: {"years": [...], "count": [...], "rate": [...],
+                          "rate_err_minus": [...], "rate_err_plus": [...]}}}
+The raw aggregates it is built from (counts, total_speeches, id_country) are
+kept in viz_counts.json.
+
+Usage (rebuild viz_cache.json from viz_counts.json, e.g. after editing coverage.json):
+  python viz_series.py
+"""
+import argparse
+import json
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+COVERAGE_PATH = "coverage.json"
+OUT_VIZ_CACHE = "viz_cache.json"
+OUT_VIZ_COUNTS = "viz_counts.json"
+SERIES_FIELDS = ("count", "rate", "rate_err_minus", "rate_err_plus")
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+def load_coverage(path: str = COVERAGE_PATH) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def coverage_mask(years: pd.Series, countries: pd.Series, coverage: dict) -> np.ndarray:
+    mask = ~years.isin(coverage.get("exclude_years", [])).to_numpy()
+    min_year = countries.map(coverage.get("country_min_year", {})).fillna(-np.inf).to_numpy()
+    return mask & (years.to_numpy() >= min_year)
+
+
+def wilson_interval(k: np.ndarray, n: np.ndarray, confidence: float = 0.95) -> tuple[np.ndarray, np.ndarray]:
+    """Wilson score interval for proportions k/n (0 where n == 0)."""
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    n_safe = np.maximum(n, 1)
+    p = k / n_safe
+    denom = 1 + z ** 2 / n_safe
+    centre = (p + z ** 2 / (2 * n_safe)) / denom
+    half = z * np.sqrt(p * (1 - p) / n_safe + z ** 2 / (4 * n_safe ** 2)) / denom
+    lo = np.where(n > 0, np.clip(centre - half, 0, 1), 0.0)
+    hi = np.where(n > 0, np.clip(centre + half, 0, 1), 0.0)
+    return lo, hi
+
+
+# ----------------------------
+# Series
+# ----------------------------
+def build_series(counts: pd.DataFrame, totals: pd.DataFrame, keyword_ids, coverage: dict) -> dict:
+    """counts: year, keyword, country, count; totals: year, country, total_speeches."""
+    totals = totals.dropna(subset=["year"]).assign(year=lambda d: d["year"].astype(int))
+    totals = totals[coverage_mask(totals["year"], totals["country"], coverage) & (totals["total_speeches"] > 0)]
+
+    # Every keyword against every covered (year, country) with speeches
+    grid = totals.merge(pd.DataFrame({"keyword": [str(k) for k in keyword_ids]}), how="cross")
+    counts = counts.dropna(subset=["year"]).assign(year=lambda d: d["year"].astype(int), keyword=lambda d: d["keyword"].astype(str))
+    counts = counts.groupby(["year", "keyword", "country"], as_index=False)["count"].sum()
+    grid = grid.merge(counts, on=["year", "keyword", "country"], how="left")
+    grid["count"] = grid["count"].fillna(0).astype(int)
+
+    omit = grid["country"].isin(coverage.get("omit_zero_points", [])) & (grid["count"] == 0)
+    grid = grid[~omit].sort_values(["keyword", "country", "year"])
+
+    k = grid["count"].to_numpy(dtype=float)
+    n = grid["total_speeches"].to_numpy(dtype=float)
+    rate = k / n
+    lo, hi = wilson_interval(k, n, coverage.get("confidence", 0.95))
+    grid["rate"] = (rate * 100).round(3)
+    grid["rate_err_minus"] = ((rate - lo) * 100).round(3)
+    grid["rate_err_plus"] = ((hi - rate) * 100).round(3)
+
+    series = {}
+    for (kid, country), g in grid.groupby(["keyword", "country"], sort=False):
+        entry = {"years": g["year"].tolist()}
+        entry.update({field: g[field].tolist() for field in SERIES_FIELDS})
+        series.setdefault(kid, {})[country] = entry
+    return series
+
+
+def covered_years(totals: pd.DataFrame, coverage: dict) -> list[int]:
+    totals = totals.dropna(subset=["year"]).assign(year=lambda d: d["year"].astype(int))
+    return sorted(totals.loc[coverage_mask(totals["year"], totals["country"], coverage), "year"].unique().tolist())
+
+
+def build_cache(keywords: dict, counts: pd.DataFrame, totals: pd.DataFrame, coverage: dict) -> dict:
+    """The page payload: keyword names, coverage, covered years and plot series."""
+    return {
+        "keywords": keywords,
+        "coverage": coverage,
+        "years": covered_years(totals, coverage),
+        "series": build_series(counts, totals, keywords, coverage),
+    }
+
+
+def write_cache(cache: dict, path: str = OUT_VIZ_CACHE) -> None:
+    with open(path, "w") as f:
+        json.dump(cache, f, separators=(",", ":"))
+
+
+# ----------------------------
+# CLI
+# ----------------------------
+def main():
+    p = argparse.ArgumentParser(description="Rebuild viz_cache.json from the raw aggregates in viz_counts.json")
+    p.add_argument("--counts", default=OUT_VIZ_COUNTS)
+    p.add_argument("--coverage", default=COVERAGE_PATH)
+    p.add_argument("-o", "--out", default=OUT_VIZ_CACHE)
+    args = p.parse_args()
+
+    with open(args.counts) as f:
+        raw = json.load(f)
+    counts = pd.DataFrame(raw["counts"])
+    totals = pd.DataFrame(raw["total_speeches"])
+
+    cache = build_cache(raw["keywords"], counts, totals, load_coverage(args.coverage))
+    write_cache(cache, args.out)
+    print(f"series size: {sum(len(v) for v in cache['series'].values())}")
+
+
+if __name__ == "__main__":
+    main()
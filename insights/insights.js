@@ -101,41 +101,45 @@ function updateSelectionCounts() {
   });
 }
 
-function buildCounts(countRows, selectedCountries, selectedKeywordIds, minYear, maxYear) {
-  // countRows: {year, keyword, country, count}
-  const yearSet = new Set();
-  const countsByKwAndCountry = {}; // {keyword: {country: {year: count}}}
+function lowerBound(arr, value) {
+  // First index in sorted arr whose element is >= value
+  let lo = 0;
+  let hi = arr.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (arr[mid] < value) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+function selectSeries(series, selectedCountries, selectedKeywordIds, minYear, maxYear) {
+  // series: {keyword: {country: {years, count, rate, rate_err_minus, rate_err_plus}}}
+  // Counts, rates and coverage filters are precomputed in data/keywords.py; here we only slice the year range
+  const selected = {}; // same shape, restricted to the selection
+  let hasData = false;
   
   selectedKeywordIds.forEach(k => {
-    countsByKwAndCountry[k] = {};
+    selected[k] = {};
     selectedCountries.forEach(c => {
-      countsByKwAndCountry[k][c] = {};
+      const s = series[k] && series[k][c];
+      if (!s) return;
+      const lo = lowerBound(s.years, minYear);
+      const hi = lowerBound(s.years, maxYear + 1);
+      if (hi === lo) return;
+      const sliced = {};
+      Object.keys(s).forEach(field => {
+        sliced[field] = s[field].slice(lo, hi);
+      });
+      selected[k][c] = sliced;
+      hasData = true;
     });
   });
   
-  for (const r of countRows) {
-    // Exclude 2026 and Russia data from 2013 and earlier
-    const year = Math.floor(parseFloat(r.year));
-    if (year === 2026) continue;
-    if (r.country === 'Russia' && year <= 2013) continue;
-    // Filter by year range
-    if (year < minYear || year > maxYear) continue;
-    
-    if (!selectedCountries.includes(r.country)) continue;
-    if (!selectedKeywordIds.includes(r.keyword)) continue;
-    const y = String(year);
-    yearSet.add(y);
-    if (!countsByKwAndCountry[r.keyword][r.country][y]) {
-      countsByKwAndCountry[r.keyword][r.country][y] = 0;
-    }
-    countsByKwAndCountry[r.keyword][r.country][y] += r.count;
-  }
-  
-  const years = Array.from(yearSet).map(y=>+y).sort((a,b)=>a-b);
-  return { years, countsByKwAndCountry };
+  return { selected, hasData };
 }
 
-function drawPlot(years, countsByKwAndCountry, keywordMap, selectedCountries, totalSpeechesByYearCountry, normalized, selectedKeywordIds, eventLines) {
+function drawPlot(selected, keywordMap, selectedCountries, normalized, selectedKeywordIds, eventLines) {
   const traces = [];
   
   // Color palette for keywords - will vary by country
@@ -171,40 +175,36 @@ function drawPlot(years, countsByKwAndCountry, keywordMap, selectedCountries, to
     }
   }
   
-  Object.keys(countsByKwAndCountry).forEach(kid => {
+  Object.keys(selected).forEach(kid => {
     selectedCountries.forEach(country => {
-      // For Russia, only plot years where it has actual data to avoid gaps
-      let xData = years;
-      let yData = years.map(y => {
-        let count = countsByKwAndCountry[kid][country][String(y)] || 0;
-        if (normalized && totalSpeechesByYearCountry[country] && totalSpeechesByYearCountry[country][String(y)]) {
-          const total = totalSpeechesByYearCountry[country][String(y)];
-          return total > 0 ? (count / total) * 100 : 0;
-        }
-        return count;
-      });
-      
-      if (country === 'Russia') {
-        // Filter to only include years with data
-        const dataPoints = years
-          .map((y, i) => ({ year: y, count: yData[i] }))
-          .filter(p => p.count > 0);
-        xData = dataPoints.map(p => p.year);
-        yData = dataPoints.map(p => p.count);
-      }
+      const s = selected[kid][country];
+      if (!s) return;
       
       const lineColor = getLineColor(kid, country);
       
-      traces.push({
-        x: xData,
-        y: yData,
+      const trace = {
+        x: s.years,
+        y: normalized ? s.rate : s.count,
         mode: 'lines+markers',
         name: `${keywordMap[kid]} (${country})`,
         line: { width: 2, color: lineColor },
         marker: { size: 6, color: lineColor },
         legendgroup: kid,
         legendgrouptitle: { text: keywordMap[kid] }
-      });
+      };
+      if (normalized) {
+        // Confidence interval of the percentage
+        trace.error_y = {
+          type: 'data',
+          symmetric: false,
+          array: s.rate_err_plus,
+          arrayminus: s.rate_err_minus,
+          color: lineColor,
+          thickness: 1,
+          width: 0
+        };
+      }
+      traces.push(trace);
     });
   });
   
@@ -273,7 +273,7 @@ async function initKeywordViz() {
   const cache = await loadCache('../data/viz_cache.json');
 
   const keywordMap = cache.keywords;
-  const countRows = cache.counts;
+  const series = cache.series;
 
   // Load events data
   const eventsResponse = await fetch('./events.csv').then(r => r.text());
@@ -281,22 +281,13 @@ async function initKeywordViz() {
 
   createKeywordsCheckboxes(keywordMap, eventLines);
 
-  // Build total speeches per year per country from cache
-  const totalSpeechesByYearCountry = { China: {}, Russia: {} };
-  for (const t of cache.total_speeches) {
-    const year = Math.floor(parseFloat(t.year));
-    if (year === 2026) continue;
-    if (t.country === 'Russia' && year <= 2013) continue;
-    
-    const y = String(year);
-    totalSpeechesByYearCountry[t.country][y] = t.total_speeches;
-  }
-
   // Track selected countries and mode
   let selectedCountries = { China: true, Russia: true };
   let normalizedMode = true;
-  let minYear = 2005;
-  let maxYear = 2025;
+  // Year range offered by the page comes from the covered years in the cache (data/coverage.json)
+  const coveredYears = cache.years;
+  let minYear = coveredYears[0];
+  let maxYear = coveredYears[coveredYears.length - 1];
   
   const chinaBtn = document.getElementById('country-china-btn');
   const russiaBtn = document.getElementById('country-russia-btn');
@@ -304,6 +295,12 @@ async function initKeywordViz() {
   const adjustedBtn = document.getElementById('mode-adjusted-btn');
   const yearMinInput = document.getElementById('year-min');
   const yearMaxInput = document.getElementById('year-max');
+  [yearMinInput, yearMaxInput].forEach(input => {
+    input.min = minYear;
+    input.max = maxYear;
+  });
+  yearMinInput.value = minYear;
+  yearMaxInput.value = maxYear;
   
   function updateButtonStyles() {
     if (selectedCountries.China) {
@@ -372,13 +369,13 @@ async function initKeywordViz() {
       document.getElementById('kw-chart').innerHTML = '<div class="kw-viz-note">Select one or more keywords and countries to show trend</div>';
       return;
     }
-    const { years, countsByKwAndCountry } = buildCounts(countRows, countriesToShow, selectedKs, minYear, maxYear);
-    if (years.length === 0) {
+    const { selected, hasData } = selectSeries(series, countriesToShow, selectedKs, minYear, maxYear);
+    if (!hasData) {
       Plotly.purge('kw-chart');
       document.getElementById('kw-chart').innerHTML = '<div class="kw-viz-note">No data for this selection</div>';
       return;
     }
-    drawPlot(years, countsByKwAndCountry, keywordMap, countriesToShow, totalSpeechesByYearCountry, normalizedMode, selectedKs, eventLines);
+    drawPlot(selected, keywordMap, countriesToShow, normalizedMode, selectedKs, eventLines);
   }
 
   // auto-update when any keyword checkbox changes